@@ -1,142 +1,145 @@
 import streamlit as st
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-import time
-import os
-from urllib.parse import urlparse, urlencode
+import numpy as np
+import io
 import re
-from bs4 import BeautifulSoup
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from scraper import (
+    JOB_COLUMNS,
+    LinkedInBlocked,
+    normalize_links,
+    scrape_guest,
+    scrape_many,
+)
 
+# --- Post Date Patterns (compiled once) ---
+_DIGIT_RE = re.compile(r"(\d+)")
+_UNIT_NOW = ("now", "minute", "hour")
+_NOW_RE = re.compile("|".join(_UNIT_NOW))
 
-# This function checks if the app is running in a containerized cloud environment
-def is_running_in_cloud():
-    """
-    Returns True if the app is running in a cloud environment (like Render or Streamlit Cloud),
-    False otherwise. It checks for a common environment variable.
-    """
-    return "PORT" in os.environ or "STREAMLIT_SERVER_PORT" in os.environ
+# --- Number of Chrome instances to run side by side ---
+MAX_SCRAPE_WORKERS = 4
 
 
-def scrape_linkedin(role, location, experience_levels):
+def convert_post_date_to_days(post_dates):
     """
-    Scrapes job listings from LinkedIn for a given role, location, and filters.
+    Converts a Series of 'X days/weeks/months ago' strings to numbers of days.
+    Anything that can't be read as a date gets 999 so it sorts last.
     """
-    chrome_options = Options()
-
-    # --- Selenium Setup for Cloud Environment ---
-    if is_running_in_cloud():
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.binary_location = "/usr/bin/chromium"
-
-    driver = None
-    try:
-        # --- Use Selenium Manager ---
-        service = Service()
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-
-        # --- Build LinkedIn URL with Filters ---
-        base_url = "https://www.linkedin.com/jobs/search/?"
-        params = {"keywords": role, "location": location}
-
-        if experience_levels:
-            params["f_E"] = ",".join(experience_levels)
-
-        search_url = base_url + urlencode(params)
-        driver.get(search_url)
-
-        # --- Wait for job listings to load ---
-        wait = WebDriverWait(driver, 20)
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "base-card")))
-
-        # --- Scrolling to load all jobs ---
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        for _ in range(5):  # Increased scroll attempts for longer pages
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)  # Shorter sleep, but still necessary for dynamic loading
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
-
-        # --- Scraping with BeautifulSoup ---
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-
-        job_listings = soup.find_all("div", class_="base-card")
-
-        if not job_listings:
-            st.sidebar.warning(f"No listings found in '{location}'.")
-            return pd.DataFrame()
-
-        jobs_data = []
-        for job in job_listings:
-            title_tag = job.find("h3", class_="base-search-card__title")
-            company_tag = job.find("h4", class_="base-search-card__subtitle")
-            date_tag = job.find("time", class_="job-search-card__listdate")
-            link_tag = job.find("a", class_="base-card__full-link")
-
-            title = title_tag.text.strip() if title_tag else "N/A"
-            company = company_tag.text.strip() if company_tag else "N/A"
-            post_date = date_tag.text.strip() if date_tag else "N/A"
-            link = link_tag["href"] if link_tag else "N/A"
-
-            if link and link != "N/A":
-                clean_link = link.split("?")[0]
-                if not clean_link.endswith("/"):
-                    clean_link += "/"
-                parsed_url = urlparse(clean_link)
-                link = f"https://www.linkedin.com{parsed_url.path}"
-
-            jobs_data.append(
-                {
-                    "Job Title": title,
-                    "Company": company,
-                    "Post Date": post_date,
-                    "Link": link,
-                    "Searched Location": location,
-                }
-            )
+    post_dates = post_dates.str.lower().fillna("")
+    num = pd.to_numeric(
+        post_dates.str.extract(_DIGIT_RE, expand=False), errors="coerce"
+    )
 
-        return pd.DataFrame(jobs_data)
+    days = np.select(
+        [
+            post_dates.str.contains("day", regex=False),
+            post_dates.str.contains("week", regex=False),
+            post_dates.str.contains("month", regex=False),
+        ],
+        [num, num * 7, num * 30],
+        default=np.nan,
+    )
+    days = np.where(post_dates.str.contains(_NOW_RE), 0, days)
+    return pd.Series(days, index=post_dates.index).fillna(999).astype("int32")
 
-    except Exception as e:
-        st.sidebar.error(f"Error scraping {location}: {e}")
-        return pd.DataFrame()
-    finally:
-        if driver:
-            driver.quit()
 
+def clean_jobs(jobs_df):
+    """
+    Normalizes the job links, drops duplicate jobs (same title, company and
+    link, keeping the first one seen) and orders the rest by post date, most
+    recent first, in a single dedup and argsort pass instead of separate
+    drop_duplicates and sort_values copies.
+    """
+    jobs_df["Link"] = normalize_links(jobs_df["Link"])
+
+    seen = set()
+    keep = []
+    keys = zip(
+        jobs_df["Job Title"].to_numpy(),
+        jobs_df["Company"].to_numpy(),
+        jobs_df["Link"].to_numpy(),
+    )
+    for i, key in enumerate(keys):
+        if key not in seen:
+            seen.add(key)
+            keep.append(i)
+    keep = np.array(keep, dtype=np.intp)
 
-def convert_post_date_to_days(post_date_str):
-    """Converts 'X days/weeks/months ago' string to a number of days."""
-    if not isinstance(post_date_str, str):
-        return 999
+    days = convert_post_date_to_days(jobs_df["Post Date"]).to_numpy()
+    order = keep[np.argsort(days[keep], kind="stable")]
+    return jobs_df.iloc[order].reset_index(drop=True)
 
-    post_date_str = post_date_str.lower()
 
-    if "now" in post_date_str or "minute" in post_date_str or "hour" in post_date_str:
-        return 0
+def build_csv(jobs_df):
+    """
+    Encodes the jobs as CSV bytes. Called once per search; the bytes are kept
+    in session state, so reruns reuse them instead of re-encoding.
+    """
+    # Write the encoded CSV straight into a buffer rather than building a str
+    csv_buf = io.BytesIO()
+    jobs_df.to_csv(csv_buf, index=False, encoding="utf-8")
+    return csv_buf.getvalue()
 
-    try:
-        num = int(re.search(r"\d+", post_date_str).group())
-        if "day" in post_date_str:
-            return num
-        elif "week" in post_date_str:
-            return num * 7
-        elif "month" in post_date_str:
-            return num * 30
+
+@st.cache_data(ttl=600, show_spinner=False)
+def search_jobs(role, locations, experience_codes):
+    """
+    Scrapes every location, trying LinkedIn's guest endpoint first and Chrome
+    for whatever it couldn't serve. Returns (results, blocked): a (location,
+    rows, error) tuple per location and the set of locations LinkedIn blocked.
+    Cached for ten minutes per (role, locations, experience levels), so
+    repeating a search comes back instantly. Cached calls are replayed, so this
+    must not touch Streamlit elements created outside it.
+    """
+    # Try LinkedIn's guest endpoint first; it needs no browser
+    guest_results = scrape_guest(role, locations, experience_codes)
+    blocked = {
+        loc for loc, _, error in guest_results if isinstance(error, LinkedInBlocked)
+    }
+    # Chrome on this server would hit the same wall when blocked, so don't
+    # spend time starting it
+    fallback = [] if blocked else [loc for loc, _, e in guest_results if e is not None]
+    results = [
+        # Some errors, like aiohttp's timeout, have no message of their own
+        (loc, rows, str(error) or type(error).__name__ if error is not None else None)
+        for loc, rows, error in guest_results
+        if loc not in fallback
+    ]
+
+    # Locations the guest endpoint couldn't serve are scraped with Chrome. They
+    # are split between worker threads, each driving its own browser and
+    # reusing it for every location it was given.
+    if fallback:
+        workers = min(len(fallback), MAX_SCRAPE_WORKERS)
+        batches = [fallback[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(scrape_many, role, batch, experience_codes)
+                for batch in batches
+            ]
+            for future in as_completed(futures):
+                results.extend(future.result())
+
+    # Back into input order, so clean_jobs keeps a job's first searched
+    # location however the threads finished
+    position = {loc: i for i, loc in enumerate(locations)}
+    results.sort(key=lambda result: position[result[0]])
+    return results, blocked
+
+
+def report_results(results, all_rows):
+    """
+    Shows any per-location errors or empty results in the UI and adds the
+    scraped rows to all_rows.
+    """
+    for loc, scraped_rows, error in results:
+        if error is not None:
+            st.error(f"Error scraping {loc}: {error}")
+        elif not scraped_rows:
+            st.warning(f"No listings found in '{loc}'.")
         else:
-            return 999
-    except (AttributeError, ValueError):
-        return 999
+            all_rows.extend(scraped_rows)
 
 
 # --- Streamlit App UI ---
@@ -171,9 +174,6 @@ st.markdown(
     div[data-testid="stTextInput"], div[data-testid="stMultiSelect"] {
         margin-bottom: 15px;
     }
-    th {
-        text-align: center !important;
-    }
     </style>
     """,
     unsafe_allow_html=True,
@@ -194,8 +194,10 @@ st.info(
 # --- Session State Initialization ---
 if "cleaned_df" not in st.session_state:
     st.session_state.cleaned_df = None
-if "jobs_df" not in st.session_state:
-    st.session_state.jobs_df = None
+if "csv_bytes" not in st.session_state:
+    st.session_state.csv_bytes = None
+if "total_listings" not in st.session_state:
+    st.session_state.total_listings = 0
 if "search_triggered" not in st.session_state:
     st.session_state.search_triggered = False
 
@@ -225,43 +227,50 @@ with st.sidebar:
         submitted = st.form_submit_button("Search Jobs")
 
     if submitted:
-        if not role or not locations_input:
+        locations = [loc.strip() for loc in locations_input.split(",") if loc.strip()]
+        if not role or not locations:
             st.error("Please provide a job role and at least one location.")
         else:
             st.session_state.search_triggered = True
             st.session_state.exp_level_options = exp_level_options
 
             experience_codes = [EXPERIENCE_LEVELS[level] for level in exp_level_options]
-            locations = [loc.strip() for loc in locations_input.split(",")]
-            all_jobs_list = []
+            all_rows = []
 
-            progress_bar = st.progress(0)
             status_text = st.empty()
 
-            for i, loc in enumerate(locations):
-                if loc:
-                    with st.spinner(f"Searching for '{role}' in {loc}..."):
-                        scraped_data = scrape_linkedin(role, loc, experience_codes)
-                        if not scraped_data.empty:
-                            all_jobs_list.append(scraped_data)
-                    progress_bar.progress((i + 1) / len(locations))
+            with st.spinner(
+                f"Searching for '{role}' in {len(locations)} location(s)..."
+            ):
+                # One cache entry per role, location list and experience levels
+                search_key = (role, tuple(locations), tuple(experience_codes))
+                results, blocked = search_jobs(*search_key)
+                if any(error is not None for _, _, error in results):
+                    # Don't keep failures around; retry them on the next search
+                    search_jobs.clear(*search_key)
+                if blocked:
+                    # One message covers every blocked location
+                    st.error(
+                        "LinkedIn is blocking or rate limiting requests from this "
+                        "server. Please try again later."
+                    )
+                report_results(
+                    [result for result in results if result[0] not in blocked],
+                    all_rows,
+                )
 
             status_text.success("Search Complete!")
 
-            if all_jobs_list:
-                st.session_state.jobs_df = pd.concat(all_jobs_list, ignore_index=True)
-                st.session_state.cleaned_df = st.session_state.jobs_df.drop_duplicates(
-                    subset=["Job Title", "Company", "Link"]
+            if all_rows:
+                st.session_state.total_listings = len(all_rows)
+                st.session_state.cleaned_df = clean_jobs(
+                    pd.DataFrame(all_rows, columns=JOB_COLUMNS)
                 )
-                st.session_state.cleaned_df["Days Ago"] = st.session_state.cleaned_df[
-                    "Post Date"
-                ].apply(convert_post_date_to_days)
-                st.session_state.cleaned_df = st.session_state.cleaned_df.sort_values(
-                    by="Days Ago"
-                ).drop(columns=["Days Ago"])
+                st.session_state.csv_bytes = build_csv(st.session_state.cleaned_df)
             else:
-                st.session_state.jobs_df = None
+                st.session_state.total_listings = 0
                 st.session_state.cleaned_df = None
+                st.session_state.csv_bytes = None
 
 # --- Main Content Area ---
 if st.session_state.search_triggered:
@@ -270,28 +279,31 @@ if st.session_state.search_triggered:
         and not st.session_state.cleaned_df.empty
     ):
         st.success(
-            f"Found {len(st.session_state.jobs_df)} total listings. After cleaning, {len(st.session_state.cleaned_df)} unique jobs were found."
+            f"Found {st.session_state.total_listings} total listings. After cleaning, {len(st.session_state.cleaned_df)} unique jobs were found."
         )
 
         # --- Interactive DataFrame ---
         st.subheader("Interactive Job Listings")
-        df_display = st.session_state.cleaned_df.copy()
-        df_display["Link"] = df_display["Link"].apply(
-            lambda url: (
-                f'<a href="{url}" target="_blank">Apply</a>' if url != "N/A" else "N/A"
-            )
-        )
-        st.markdown(
-            df_display.to_html(escape=False, index=False), unsafe_allow_html=True
+        # Rendered client-side from Arrow data; the link column turns URLs into
+        # "Apply" links, and jobs without a link are left blank
+        cleaned_df = st.session_state.cleaned_df
+        st.dataframe(
+            cleaned_df.assign(
+                Link=cleaned_df["Link"].mask(cleaned_df["Link"] == "N/A")
+            ),
+            column_config={
+                "Link": st.column_config.LinkColumn("Apply", display_text="Apply")
+            },
+            hide_index=True,
+            use_container_width=True,
         )
 
         # --- Download Button ---
         st.subheader("Download Data")
         csv_role = role.replace(" ", "_")
-        csv = st.session_state.cleaned_df.to_csv(index=False).encode("utf-8")
         st.download_button(
             label="Download as CSV",
-            data=csv,
+            data=st.session_state.csv_bytes,
             file_name=f"{csv_role}_jobs.csv",
             mime="text/csv",
         )
@@ -322,7 +334,8 @@ if st.session_state.search_triggered:
     if st.button("Clear Results"):
         st.session_state.search_triggered = False
         st.session_state.cleaned_df = None
-        st.session_state.jobs_df = None
+        st.session_state.csv_bytes = None
+        st.session_state.total_listings = 0
         st.rerun()
 
 else:
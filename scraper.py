@@ -0,0 +1,428 @@
+import asyncio
+import json
+import re
+import aiohttp
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+import os
+from urllib.parse import urlencode
+from selectolax.lexbor import LexborHTMLParser
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    TimeoutException,
+    WebDriverException,
+)
+
+# --- LinkedIn Site ---
+_LINKEDIN_ORIGIN = "https://www.linkedin.com"
+# Skips an optional scheme and host, then captures the path up to any ? or #
+_LINK_PATH_RE = re.compile(r"^(?:[^/]*//[^/?#]*)?([^?#]*)")
+
+# --- Columns of each scraped job row, in tuple order ---
+JOB_COLUMNS = ["Job Title", "Company", "Post Date", "Link", "Searched Location"]
+
+# --- LinkedIn Guest Jobs Endpoint ---
+GUEST_SEARCH_URL = (
+    "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+)
+GUEST_MAX_PAGES = 10
+_GUEST_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
+    )
+}
+
+# --- Scroll rounds per search, and seconds to wait for new cards after each ---
+# (the last wait always times out)
+MAX_SCROLLS = 5
+SCROLL_WAIT_SECONDS = 3
+
+# --- Job Card Selectors, shared by the browser scripts and selectolax ---
+_CARD_SELECTOR = "div.base-card"
+_TITLE_SELECTOR = "h3.base-search-card__title"
+_COMPANY_SELECTOR = "h4.base-search-card__subtitle"
+_DATE_SELECTOR = "time.job-search-card__listdate"
+_LINK_SELECTOR = "a.base-card__full-link"
+# Stylesheets are blocked by URL pattern, so the button's visibility can't be
+# read from its layout; LinkedIn adds the --visible modifier class when it
+# shows it
+_SHOW_MORE_SELECTOR = (
+    "button.infinite-scroller__show-more-button"
+    ".infinite-scroller__show-more-button--visible:not([disabled])"
+)
+
+# --- Page Helpers, evaluated through CDP ---
+_CARD_COUNT_JS = f"document.querySelectorAll({json.dumps(_CARD_SELECTOR)}).length"
+_LOAD_MORE_CARDS_JS = """(() => {
+    const cards = document.querySelectorAll(%s);
+    if (cards.length) cards[cards.length - 1].scrollIntoView({block: "end"});
+    // Past a certain point LinkedIn stops loading on scroll and shows a
+    // "See more jobs" button instead
+    document.querySelector(%s)?.click();
+    return cards.length;
+})()""" % (
+    json.dumps(_CARD_SELECTOR),
+    json.dumps(_SHOW_MORE_SELECTOR),
+)
+
+# --- Reads [title, company, post date, href] from every card, in the browser ---
+_READ_JOB_CARDS_JS = """(() => {
+    const selectors = %s;
+    const text = (card, selector) =>
+        card.querySelector(selector)?.textContent.trim() ?? null;
+    return Array.from(document.querySelectorAll(selectors.card), (card) => [
+        text(card, selectors.title),
+        text(card, selectors.company),
+        text(card, selectors.date),
+        card.querySelector(selectors.link)?.getAttribute("href") ?? null,
+    ]);
+})()""" % json.dumps(
+    {
+        "card": _CARD_SELECTOR,
+        "title": _TITLE_SELECTOR,
+        "company": _COMPANY_SELECTOR,
+        "date": _DATE_SELECTOR,
+        "link": _LINK_SELECTOR,
+    }
+)
+
+# --- Statuses LinkedIn answers with when it blocks or rate limits a client ---
+BLOCKED_STATUSES = {403, 429, 999}
+
+
+class LinkedInBlocked(Exception):
+    """Raised when LinkedIn refuses requests from this client outright."""
+
+
+# This function checks if the app is running in a containerized cloud environment
+def is_running_in_cloud():
+    """
+    Returns True if the app is running in a cloud environment (like Render or Streamlit Cloud),
+    False otherwise. It checks for a common environment variable.
+    """
+    return "PORT" in os.environ or "STREAMLIT_SERVER_PORT" in os.environ
+
+
+# --- Chrome Flags for features the scraper doesn't use ---
+_CHROME_ARGS = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-features=IsolateOrigins,site-per-process",
+    "--mute-audio",
+    "--disable-logging",
+    "--log-level=3",
+)
+
+# --- Chrome Flags for Cloud Environment ---
+_CLOUD_CHROME_ARGS = (
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=1920,1080",
+)
+
+# --- Resources the scraper never reads ---
+_BLOCKED_URL_PATTERNS = (
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.svg",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.css",
+)
+
+# --- Chrome content settings: 2 means blocked ---
+# Images are the only such setting for page content; stylesheets and fonts are
+# blocked by _BLOCKED_URL_PATTERNS instead
+_CHROME_CONTENT_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+}
+
+
+def _build_chrome_options():
+    """
+    Builds a fresh set of Chrome options. Each driver needs its own, because
+    Selenium writes to the options it is given and drivers start concurrently.
+    """
+    chrome_options = Options()
+
+    # --- Return from driver.get() at DOMContentLoaded, not after every pixel ---
+    chrome_options.page_load_strategy = "eager"
+    for arg in _CHROME_ARGS:
+        chrome_options.add_argument(arg)
+
+    # --- Don't load content the scraper never reads (JavaScript stays on) ---
+    chrome_options.add_experimental_option("prefs", _CHROME_CONTENT_PREFS)
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+
+    # --- Selenium Setup for Cloud Environment ---
+    if is_running_in_cloud():
+        for arg in _CLOUD_CHROME_ARGS:
+            chrome_options.add_argument(arg)
+        chrome_options.binary_location = "/usr/bin/chromium"
+
+    return chrome_options
+
+
+def _make_driver():
+    """Starts a Chrome session configured for the current environment."""
+    # --- Use Selenium Manager ---
+    service = Service()
+    driver = webdriver.Chrome(service=service, options=_build_chrome_options())
+
+    # --- Skip downloading images, fonts and stylesheets ---
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": list(_BLOCKED_URL_PATTERNS)}
+        )
+    except WebDriverException:
+        driver.quit()
+        raise
+    return driver
+
+
+async def fetch_page(session, role, location, start, experience_levels):
+    """Fetches one page of guest search results and parses its job cards."""
+    params = {"keywords": role, "location": location, "start": start}
+    if experience_levels:
+        params["f_E"] = ",".join(experience_levels)
+
+    async with session.get(GUEST_SEARCH_URL, params=params) as response:
+        if response.status in BLOCKED_STATUSES:
+            raise LinkedInBlocked(
+                f"LinkedIn refused the request (HTTP {response.status})"
+            )
+        response.raise_for_status()
+        html = await response.text()
+    # Past the last result LinkedIn sends an empty page, but an empty first
+    # page is how its bot wall answers with a 200
+    if start == 0 and not html.strip():
+        raise LinkedInBlocked("LinkedIn returned an empty page")
+    return _parse_job_cards(html, location)
+
+
+async def fetch_all(session, role, location, experience_levels):
+    """
+    Pages through the guest search results for one location until LinkedIn runs
+    out of cards. Only a failure on the first page is raised; a later one just
+    ends the search with what was collected so far.
+    """
+    jobs = []
+    for _ in range(GUEST_MAX_PAGES):
+        try:
+            page = await fetch_page(
+                session, role, location, len(jobs), experience_levels
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError, LinkedInBlocked):
+            if not jobs:
+                raise
+            break
+        if not page:
+            break
+        jobs.extend(page)
+    return jobs
+
+
+async def _fetch_locations(role, locations, experience_levels):
+    async with aiohttp.ClientSession(
+        headers=_GUEST_HEADERS, timeout=aiohttp.ClientTimeout(total=30)
+    ) as session:
+        pages = await asyncio.gather(
+            *[fetch_all(session, role, loc, experience_levels) for loc in locations],
+            return_exceptions=True,
+        )
+
+    results = []
+    for loc, jobs in zip(locations, pages):
+        if isinstance(jobs, Exception):
+            results.append((loc, [], jobs))
+        else:
+            results.append((loc, jobs, None))
+    return results
+
+
+def scrape_guest(role, locations, experience_levels):
+    """
+    Scrapes all locations concurrently through LinkedIn's guest jobs endpoint,
+    which serves the job cards as plain HTML, so no browser is needed. Returns
+    (location, jobs, error) tuples like scrape_many, except that error is the
+    exception itself, so callers can tell a LinkedInBlocked apart.
+    """
+    return asyncio.run(_fetch_locations(role, locations, experience_levels))
+
+
+def scrape_many(role, locations, experience_levels):
+    """
+    Scrapes several locations in turn, reusing one Chrome session for all of them.
+
+    Runs in a worker thread, so it must not call into Streamlit. Returns a
+    list of (location, jobs, error) tuples, where jobs is a list of job rows and
+    error is None or the message of the exception that stopped that location.
+    """
+    results = []
+    driver = None
+    try:
+        for location in locations:
+            try:
+                try:
+                    if driver is None:
+                        driver = _make_driver()
+                    else:
+                        # Don't let LinkedIn resume the previous search
+                        _clear_linkedin_state(driver)
+                    jobs = scrape_linkedin(driver, role, location, experience_levels)
+                except InvalidSessionIdException:
+                    # The browser session was lost, so start a new one and retry.
+                    # driver is still None if the session died while starting.
+                    if driver is not None:
+                        driver.quit()
+                    driver = _make_driver()
+                    jobs = scrape_linkedin(driver, role, location, experience_levels)
+                results.append((location, jobs, None))
+            except Exception as e:
+                results.append((location, [], str(e) or type(e).__name__))
+    finally:
+        if driver:
+            driver.quit()
+    return results
+
+
+def scrape_linkedin(driver, role, location, experience_levels):
+    """
+    Scrapes job listings from LinkedIn for a given role, location, and filters,
+    using an already running driver. Returns one row per job, with the fields
+    in JOB_COLUMNS order.
+    """
+    # --- Build LinkedIn URL with Filters ---
+    base_url = f"{_LINKEDIN_ORIGIN}/jobs/search/?"
+    params = {"keywords": role, "location": location}
+
+    if experience_levels:
+        params["f_E"] = ",".join(experience_levels)
+
+    search_url = base_url + urlencode(params)
+    driver.get(search_url)
+
+    # --- Wait for job listings to load ---
+    wait = WebDriverWait(driver, 15)
+    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, _CARD_SELECTOR)))
+
+    # --- Scrolling to load all jobs ---
+    for _ in range(MAX_SCROLLS):
+        # LinkedIn loads the next batch once the last card comes into view or
+        # the "See more jobs" button is clicked
+        loaded = _evaluate(driver, _LOAD_MORE_CARDS_JS)
+        # Continue as soon as more cards appear instead of sleeping a fixed time
+        try:
+            WebDriverWait(driver, SCROLL_WAIT_SECONDS, poll_frequency=0.25).until(
+                lambda d: _evaluate(d, _CARD_COUNT_JS) > loaded
+            )
+        except TimeoutException:
+            break
+
+    # --- Read the card fields inside the browser ---
+    # Only the field strings come back over CDP, so the page is never
+    # serialized or parsed
+    return [
+        _job_row(*fields, location)
+        for fields in _evaluate(driver, _READ_JOB_CARDS_JS) or []
+    ]
+
+
+def _clear_linkedin_state(driver):
+    """
+    Clears cookies and LinkedIn's stored site data over the Chrome DevTools
+    Protocol. Unlike clearing storage from a page script, this works whatever
+    page the previous search left behind, even a Chrome error page.
+    """
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.execute_cdp_cmd(
+        "Storage.clearDataForOrigin",
+        {"origin": _LINKEDIN_ORIGIN, "storageTypes": "all"},
+    )
+
+
+def _evaluate(driver, expression):
+    """
+    Evaluates a JavaScript expression over the Chrome DevTools Protocol and
+    returns its value. This skips the WebDriver command layer that
+    execute_script goes through, which matters in the scroll polling loop and
+    for the card read-out. Raises WebDriverException if the script throws,
+    which Runtime.evaluate itself only reports in exceptionDetails.
+    """
+    result = driver.execute_cdp_cmd(
+        "Runtime.evaluate", {"expression": expression, "returnByValue": True}
+    )
+    if "exceptionDetails" in result:
+        details = result["exceptionDetails"]
+        # text is just "Uncaught"; the thrown error and its stack trace are in
+        # the exception's description
+        error = details.get("exception", {}).get("description") or details["text"]
+        raise WebDriverException(f"Page script failed: {error.splitlines()[0]}")
+    return result["result"].get("value")
+
+
+def normalize_links(links):
+    """
+    Strips tracking parameters and the regional subdomain from a Series of job
+    links in one vectorized pass, so the same job gets the same link from every
+    searched location. N/A entries are left alone.
+    """
+    has_link = links != "N/A"
+    paths = links[has_link].str.extract(_LINK_PATH_RE, expand=False)
+    paths = paths.where(paths.str.endswith("/"), paths + "/")
+    return links.where(~has_link, _LINKEDIN_ORIGIN + paths)
+
+
+def _job_row(title, company, post_date, href, location):
+    """
+    Builds a job row, a tuple in JOB_COLUMNS order, from a card's raw fields.
+    Missing fields become N/A. Tuples keep the final DataFrame build cheap.
+    """
+    return (
+        title if title is not None else "N/A",
+        company if company is not None else "N/A",
+        post_date if post_date is not None else "N/A",
+        # Raw href; normalize_links cleans the whole column up at once later
+        href if href else "N/A",
+        location,
+    )
+
+
+def _parse_job_cards(html, location):
+    """Extracts one job row per job card found in a chunk of LinkedIn HTML."""
+    tree = LexborHTMLParser(html)
+
+    job_listings = tree.css(_CARD_SELECTOR)
+
+    jobs_data = []
+    for job in job_listings:
+        title_tag = job.css_first(_TITLE_SELECTOR)
+        company_tag = job.css_first(_COMPANY_SELECTOR)
+        date_tag = job.css_first(_DATE_SELECTOR)
+        link_tag = job.css_first(_LINK_SELECTOR)
+
+        jobs_data.append(
+            _job_row(
+                title_tag.text().strip() if title_tag else None,
+                company_tag.text().strip() if company_tag else None,
+                date_tag.text().strip() if date_tag else None,
+                link_tag.attributes.get("href") if link_tag else None,
+                location,
+            )
+        )
+
+    return jobs_data